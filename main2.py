@@ -1,14 +1,20 @@
 import streamlit as st
 import sqlite3
+import atexit
 import os
 import re
+import random
 import csv
 import io
-from PIL import Image
+import shutil
+import bcrypt
+import pandas as pd
+from PIL import Image, ImageOps
 from io import BytesIO
+from contextlib import closing
 from reportlab.lib.pagesizes import letter
 from reportlab.pdfgen import canvas
-from reportlab.lib.utils import ImageReader
+from reportlab.lib.utils import ImageReader, simpleSplit
 
 # --- Page Config ---
 st.set_page_config(page_title="Student Portal", layout="wide")
@@ -16,10 +22,35 @@ st.set_page_config(page_title="Student Portal", layout="wide")
 # --- Upload Directory ---
 os.makedirs("uploads", exist_ok=True)
 
+LOGO_PATH = r"C:\Users\kumaw\PycharmProjects\PythonProject\logo1.png"
+
+
+@st.cache_resource
+def _logo_exists():
+    # the logo never moves while the app is running; cache_resource checks it once per process, not per rerun
+    return os.path.exists(LOGO_PATH)
+
+
+LOGO_EXISTS = _logo_exists()
+
 # --- DB Setup ---
 DB_PATH = "student_data.db"
-conn = sqlite3.connect(DB_PATH, check_same_thread=False)
-c = conn.cursor()
+
+
+def _open_db():
+    db = sqlite3.connect(DB_PATH, check_same_thread=False)
+    # autocommit mode: single statements commit on their own, bulk writes open an explicit BEGIN
+    db.isolation_level = None
+    # rows support access by column name, e.g. row["name"]
+    db.row_factory = sqlite3.Row
+    # WAL lets readers run alongside a writer and, with synchronous=NORMAL, avoids an fsync per commit
+    db.execute("PRAGMA journal_mode=WAL")
+    db.execute("PRAGMA synchronous=NORMAL")
+    db.execute("PRAGMA temp_store=MEMORY")
+    db.execute("PRAGMA cache_size=-20000")
+    db.execute("PRAGMA mmap_size=268435456")
+    return db
+
 
 # Full desired schema (column_name: column_definition)
 DESIRED_SCHEMA = {
@@ -46,78 +77,185 @@ DESIRED_SCHEMA = {
 }
 
 
-def ensure_table_and_columns():
+# Column list and INSERT statement are fixed once the schema is migrated, so build them once.
+# Queries select these columns explicitly because older databases may carry extra or reordered columns.
+COL_NAMES = tuple(DESIRED_SCHEMA.keys())
+COLS_SQL = ", ".join(COL_NAMES)
+INSERT_SQL = f"INSERT INTO students ({COLS_SQL}) VALUES ({', '.join(['?'] * len(COL_NAMES))})"
+
+# --- Password Hashing ---
+
+# bcrypt only accepts passwords up to 72 bytes
+MAX_PASSWORD_BYTES = 72
+# e.g. "$2b$12$"; a bare "$2" prefix could also be a legacy plaintext password
+_BCRYPT_PREFIX_RE = re.compile(r"\$2[abxy]\$\d\d\$")
+
+
+def password_too_long(pwd):
+    return len(pwd.encode()) > MAX_PASSWORD_BYTES
+
+
+def hash_password(pwd):
+    return bcrypt.hashpw(pwd.encode(), bcrypt.gensalt(rounds=12)).decode()
+
+
+def is_password_hash(stored):
+    return bool(stored) and _BCRYPT_PREFIX_RE.match(stored) is not None
+
+
+def verify_password(pwd, stored):
+    """Check pwd against a stored bcrypt hash, or a legacy plaintext value."""
+    if is_password_hash(stored):
+        try:
+            return bcrypt.checkpw(pwd.encode(), stored.encode())
+        except ValueError:
+            return False
+    return stored == pwd
+
+
+def ensure_table_and_columns(db):
     """Create table if missing and add any missing columns to match DESIRED_SCHEMA."""
-    c.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='students'")
-    if not c.fetchone():
+    if not db.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='students'").fetchone():
         cols_def = ", ".join([f"{col} {dtype}" for col, dtype in DESIRED_SCHEMA.items()])
         create_sql = f"CREATE TABLE students ({cols_def})"
-        c.execute(create_sql)
-        conn.commit()
+        db.execute(create_sql)
+        db.commit()
         return
-    c.execute("PRAGMA table_info(students)")
-    existing = {row[1] for row in c.fetchall()}
-    for col, dtype in DESIRED_SCHEMA.items():
-        if col not in existing:
-            alter_sql = f"ALTER TABLE students ADD COLUMN {col} {dtype}"
-            c.execute(alter_sql)
-    conn.commit()
-
-
-ensure_table_and_columns()
-
-# Create a default admin account if missing (admin has access to Admin Dashboard)
-try:
-    c.execute("SELECT * FROM students WHERE uname='admin'")
-    if not c.fetchone():
-        admin_pwd = 'Admin@123'  # change after first login in production
-        insert_sql = f"INSERT INTO students ({', '.join(DESIRED_SCHEMA.keys())}) VALUES ({', '.join(['?']*len(DESIRED_SCHEMA))})"
-        values = [
-            'admin', admin_pwd, 'Administrator', '', '', 'Other', '', '', '', '', '', '', 'Admin', 'Admin', 'NA', 'NA', '', '', '', ''
-        ]
-        c.execute(insert_sql, tuple(values))
-        conn.commit()
-except Exception:
-    pass
+    info = db.execute("PRAGMA table_info(students)").fetchall()
+    existing = {row[1] for row in info}
+    missing = [(col, dtype) for col, dtype in DESIRED_SCHEMA.items() if col not in existing]
+    if missing:
+        # apply all ALTERs in one transaction; the usual no-drift startup writes nothing
+        db.execute("BEGIN")
+        for col, dtype in missing:
+            db.execute(f"ALTER TABLE students ADD COLUMN {col} {dtype}")
+        db.commit()
+    # older databases have no primary key on uname; index it so login stays an indexed lookup
+    if not any(row[1] == "uname" and row[5] for row in info):
+        db.execute("CREATE INDEX IF NOT EXISTS idx_students_uname ON students(uname)")
+
+
+def ensure_admin_account(db):
+    """Create a default admin account if missing (admin has access to Admin Dashboard)."""
+    try:
+        if not db.execute("SELECT 1 FROM students WHERE uname='admin'").fetchone():
+            admin_pwd = hash_password('Admin@123')  # change after first login in production
+            values = [
+                'admin', admin_pwd, 'Administrator', '', '', 'Other', '', '', '', '', '', '', 'Admin', 'Admin', 'NA', 'NA', '', '', '', ''
+            ]
+            db.execute(INSERT_SQL, tuple(values))
+    except Exception:
+        pass
+
+
+@st.cache_resource
+def get_connection():
+    # the script body runs on every rerun; cache_resource keeps one connection for the whole process
+    db = _open_db()
+    # PRAGMA optimize only analyzes tables this connection has queried, so it must run on the shared handle
+    atexit.register(db.execute, "PRAGMA optimize")
+    # migrate the schema and seed the admin here so it happens once per process, before any session shares db
+    ensure_table_and_columns(db)
+    ensure_admin_account(db)
+    return db
+
+
+conn = get_connection()
+c = conn.cursor()
 
 # --- Session Setup ---
-if "logged_in" not in st.session_state:
-    st.session_state.logged_in = False
-if "user_data" not in st.session_state:
-    st.session_state.user_data = None
-if "login_failed_count" not in st.session_state:
-    st.session_state.login_failed_count = 0
-if "captcha" not in st.session_state:
-    # simple math captcha: store (a, b, answer)
-    import random
+
+def _new_captcha():
+    # simple math captcha: (a, b, answer)
     a = random.randint(2, 12)
     b = random.randint(2, 12)
-    st.session_state.captcha = (a, b, a + b)
+    return (a, b, a + b)
+
+
+_SESSION_DEFAULTS = {"logged_in": False, "user_data": None, "login_failed_count": 0}
+for key, value in _SESSION_DEFAULTS.items():
+    st.session_state.setdefault(key, value)
+# captcha is generated only when missing, so it cannot sit in the defaults dict
+if "captcha" not in st.session_state:
+    st.session_state.captcha = _new_captcha()
 
 # --- Helpers ---
 
+_NAME_RE = re.compile(r"[A-Za-z ]+")
+_PWD_SYMBOLS = frozenset("@#$%^&+=!")
+_MARKS_RE = re.compile(r'\d+(\.\d{1,2})?')
+
+
 def is_valid_number(num, length=None):
-    return bool(num) and num.isdigit() and (len(num) == length if length else True)
+    # "".isdigit() is already False, so no separate emptiness check is needed
+    return num.isdigit() and (length is None or len(num) == length)
 
 
 def is_valid_name(name):
-    return bool(name) and bool(re.fullmatch(r"[A-Za-z ]+", name.strip()))
+    return bool(name) and _NAME_RE.fullmatch(name.strip()) is not None
 
 
 def is_strong_password(pwd):
-    return bool(re.fullmatch(r'(?=.*[a-z])(?=.*[A-Z])(?=.*\d)(?=.*[@#$%^&+=!]).{8,}', pwd))
+    # single pass: set one bit per required class (lower, upper, digit, symbol)
+    if len(pwd) < 8:
+        return False
+    flags = 0
+    for ch in pwd:
+        if 'a' <= ch <= 'z':
+            flags |= 1
+        elif 'A' <= ch <= 'Z':
+            flags |= 2
+        elif ch.isdecimal():
+            flags |= 4
+        elif ch in _PWD_SYMBOLS:
+            flags |= 8
+    return flags == 15
 
 
 def is_valid_marks(value):
-    return bool(re.fullmatch(r'^\d+(\.\d{1,2})?$', value.strip())) if value and value.strip() else False
+    return _MARKS_RE.fullmatch(value.strip()) is not None if value and value.strip() else False
+
+
+# uploads are stored downscaled to this size since they are never displayed larger
+IMAGE_MAX_SIZE = (400, 400)
+
+
+def _exists(path):
+    # uploaded files are not removed during a session, so remember found paths per session; misses are re-checked
+    found = st.session_state.setdefault("existing_paths", set())
+    if path in found:
+        return True
+    if os.path.exists(path):
+        found.add(path)
+        return True
+    return False
 
 
 def save_file(uploaded_file, filename):
     path = os.path.join("uploads", filename)
     if uploaded_file is None:
         return None
+    uploaded_file.seek(0)
     with open(path, "wb") as f:
-        f.write(uploaded_file.getbuffer())
+        shutil.copyfileobj(uploaded_file, f, length=1024 * 1024)
+    try:
+        with Image.open(path) as im:
+            # re-encoding drops EXIF, so apply the orientation tag first
+            im = ImageOps.exif_transpose(im)
+            if im.mode in ("RGBA", "LA", "P"):
+                # flatten transparency (e.g. signatures) onto white instead of black
+                im = im.convert("RGBA")
+                background = Image.new("RGB", im.size, "white")
+                background.paste(im, mask=im.getchannel("A"))
+                im = background
+            # convert before resizing: palette images would otherwise be resized with NEAREST
+            im = im.convert("RGB")
+            im.thumbnail(IMAGE_MAX_SIZE, Image.LANCZOS)
+        # overwrite only after the source file is closed
+        im.save(path, "JPEG", quality=85, optimize=True)
+    except Exception:
+        # not a readable image; keep the original bytes as streamed
+        pass
     return path
 
 
@@ -126,9 +264,8 @@ def save_file(uploaded_file, filename):
 def show_header():
     col1, col2 = st.columns([1, 6])
     with col1:
-        logo_path = r"C:\Users\kumaw\PycharmProjects\PythonProject\logo1.png"
-        if os.path.exists(logo_path):
-            st.image(logo_path, width=140)
+        if LOGO_EXISTS:
+            st.image(LOGO_PATH, width=140)
         else:
             st.markdown("<div style='padding:10px; color:gray;'>[Logo not found]</div>", unsafe_allow_html=True)
     with col2:
@@ -140,16 +277,41 @@ def show_header():
 # --- Admin Utilities ---
 
 def export_all_users_csv():
-    c.execute("SELECT * FROM students")
-    rows = c.fetchall()
-    c.execute("PRAGMA table_info(students)")
-    cols = [r[1] for r in c.fetchall()]
-    output = io.StringIO()
-    writer = csv.writer(output)
-    writer.writerow(cols)
-    for r in rows:
-        writer.writerow(r)
-    return output.getvalue().encode('utf-8')
+    # encode straight into one bytes buffer and stream rows from the cursor, so only one copy is held
+    output = io.BytesIO()
+    text = io.TextIOWrapper(output, encoding='utf-8', newline='')
+    writer = csv.writer(text)
+    writer.writerow(COL_NAMES)
+    writer.writerows(c.execute(f"SELECT {COLS_SQL} FROM students"))
+    # detach flushes the wrapper and releases output without closing it
+    text.detach()
+    return output.getvalue()
+
+
+IMPORT_BATCH_SIZE = 10000
+
+
+def _insert_batch(db, batch, errors):
+    """Insert a list of (row_number, values) in one transaction. On failure, retry row-by-row to report bad rows."""
+    try:
+        db.execute("BEGIN")
+        db.executemany(INSERT_SQL, [values for _, values in batch])
+        db.commit()
+        return len(batch)
+    except sqlite3.Error:
+        db.rollback()
+    imported = 0
+    db.execute("BEGIN")
+    for i, values in batch:
+        try:
+            db.execute(INSERT_SQL, values)
+            imported += 1
+        except sqlite3.IntegrityError as e:
+            errors.append(f"Row {i}: {e}")
+        except Exception as e:
+            errors.append(f"Row {i}: {e}")
+    db.commit()
+    return imported
 
 
 def import_users_from_csv(file_bytes):
@@ -162,151 +324,316 @@ def import_users_from_csv(file_bytes):
     if not required_cols.issubset(set(reader.fieldnames)):
         errors.append("CSV missing required columns. Required columns: " + ",".join(sorted(required_cols)))
         return imported, errors
-    insert_sql = f"INSERT INTO students ({', '.join(DESIRED_SCHEMA.keys())}) VALUES ({', '.join(['?']*len(DESIRED_SCHEMA))})"
-    for i, row in enumerate(reader, start=2):
-        try:
-            values = [row.get(k, '') for k in DESIRED_SCHEMA.keys()]
-            c.execute(insert_sql, tuple(values))
-            imported += 1
-        except sqlite3.IntegrityError as e:
-            errors.append(f"Row {i}: {e}")
-        except Exception as e:
-            errors.append(f"Row {i}: {e}")
-    conn.commit()
+    # the shared connection is used by every session, so the import's transactions get a connection of their own
+    with closing(_open_db()) as db:
+        pwd_index = COL_NAMES.index("pwd")
+        batch = []
+        for i, row in enumerate(reader, start=2):
+            values = [row.get(k, '') for k in COL_NAMES]
+            # store hashes only; rows exported from this app already carry one
+            pwd = values[pwd_index] or ''
+            if not is_password_hash(pwd):
+                if password_too_long(pwd):
+                    errors.append(f"Row {i}: password must be at most {MAX_PASSWORD_BYTES} bytes long.")
+                    continue
+                values[pwd_index] = hash_password(pwd)
+            batch.append((i, tuple(values)))
+            if len(batch) >= IMPORT_BATCH_SIZE:
+                imported += _insert_batch(db, batch, errors)
+                batch = []
+        if batch:
+            imported += _insert_batch(db, batch, errors)
     return imported, errors
 
 
 # --- Login and Registration ---
 
-def login_register():
-    show_header()
-    tab = st.radio("Select Option", ["Login", "Register"])
-
-    if tab == "Register":
-        st.subheader("📝 Student Registration")
-        with st.form("register_form"):
-            uname = st.text_input("Username")
-            pwd = st.text_input("Password", type="password", help="uppercase and lowercase letters, numbers, symbols")
-            name = st.text_input("Student Name")
-            father = st.text_input("Father's Name")
-            mother = st.text_input("Mother's Name")
-            gender = st.selectbox("Gender", ["Male", "Female", "Other"])
-            address = st.text_area("Address")
-            city = st.text_input("City")
-            state = st.selectbox("State", ["Select", "Rajasthan", "Karnataka", "Delhi", "Tamil Nadu"])
-            phone = st.text_input("Phone Number")
-            rrn = st.text_input("Alternative Number")
-            enroll = st.text_input("Enrollment Number")
-            degree = st.selectbox("Degree", ["Select", "B.Tech", "MCA", "MBA"])
-            branch = st.selectbox("Branch", ["Select", "CSE", "AI/ML", "ECE", "ME"])
-            sem = st.selectbox("Semester", ["Select", "I", "II", "III", "IV", "V", "VI"])
-            scheme = st.selectbox("Year", ["Select", 2021, 2022, 2023, 2024, 2025, 2026, 2027, 2028, 2029])
-            marks_10th = st.text_input("10th Marks (Percentage / CGPA / SGPA)")
-            marks_12th = st.text_input("12th Marks (Percentage / CGPA / SGPA)")
-            photo = st.file_uploader("Upload Photo", type=["jpg", "jpeg", "png"])
-            sign = st.file_uploader("Upload Signature", type=["jpg", "jpeg", "png"])
-            submit = st.form_submit_button("Register")
-
-            if submit:
-                # same validation as original but with clearer immediate errors
-                missing_fields = not all([
-                    uname, pwd, name, father, mother, gender, address,
-                    city, (state and state != "Select"), phone, rrn, enroll,
-                    (degree and degree != "Select"), (branch and branch != "Select"),
-                    (sem and sem != "Select"), (scheme and scheme != "Select"),
-                    marks_10th, marks_12th, photo, sign
-                ])
-                if missing_fields:
-                    st.error("All fields are required. Check highlighted fields.")
-                elif not all(map(is_valid_name, [name, father, mother, city])):
-                    st.error("Names and city must contain only letters and spaces.")
-                elif not is_valid_number(phone, 10):
-                    st.error("Phone must be exactly 10 digits.")
-                elif not is_strong_password(pwd):
-                    st.error("Password must be strong (A-Z, a-z, 0-9, symbol, min 8 chars).")
-                elif not is_valid_marks(marks_10th) or not is_valid_marks(marks_12th):
-                    st.error("Marks must be numeric (decimals allowed), e.g. 85 or 85.50")
-                else:
-                    photo_path = save_file(photo, f"{uname}_photo.png")
-                    sign_path = save_file(sign, f"{uname}_sign.png")
-                    columns = list(DESIRED_SCHEMA.keys())
-                    placeholders = ",".join(["?"] * len(columns))
-                    insert_sql = f"INSERT INTO students ({', '.join(columns)}) VALUES ({placeholders})"
+@st.fragment
+def _render_register():
+    st.subheader("📝 Student Registration")
+    with st.form("register_form"):
+        uname = st.text_input("Username")
+        pwd = st.text_input("Password", type="password", help="uppercase and lowercase letters, numbers, symbols")
+        name = st.text_input("Student Name")
+        father = st.text_input("Father's Name")
+        mother = st.text_input("Mother's Name")
+        gender = st.selectbox("Gender", ["Male", "Female", "Other"])
+        address = st.text_area("Address")
+        city = st.text_input("City")
+        state = st.selectbox("State", ["Select", "Rajasthan", "Karnataka", "Delhi", "Tamil Nadu"])
+        phone = st.text_input("Phone Number")
+        rrn = st.text_input("Alternative Number")
+        enroll = st.text_input("Enrollment Number")
+        degree = st.selectbox("Degree", ["Select", "B.Tech", "MCA", "MBA"])
+        branch = st.selectbox("Branch", ["Select", "CSE", "AI/ML", "ECE", "ME"])
+        sem = st.selectbox("Semester", ["Select", "I", "II", "III", "IV", "V", "VI"])
+        scheme = st.selectbox("Year", ["Select", 2021, 2022, 2023, 2024, 2025, 2026, 2027, 2028, 2029])
+        marks_10th = st.text_input("10th Marks (Percentage / CGPA / SGPA)")
+        marks_12th = st.text_input("12th Marks (Percentage / CGPA / SGPA)")
+        photo = st.file_uploader("Upload Photo", type=["jpg", "jpeg", "png"])
+        sign = st.file_uploader("Upload Signature", type=["jpg", "jpeg", "png"])
+        submit = st.form_submit_button("Register")
+
+        if submit:
+            # same validation as original but with clearer immediate errors
+            missing_fields = not all([
+                uname, pwd, name, father, mother, gender, address,
+                city, (state and state != "Select"), phone, rrn, enroll,
+                (degree and degree != "Select"), (branch and branch != "Select"),
+                (sem and sem != "Select"), (scheme and scheme != "Select"),
+                marks_10th, marks_12th, photo, sign
+            ])
+            if missing_fields:
+                st.error("All fields are required. Check highlighted fields.")
+            elif not all(map(is_valid_name, [name, father, mother, city])):
+                st.error("Names and city must contain only letters and spaces.")
+            elif not is_valid_number(phone, 10):
+                st.error("Phone must be exactly 10 digits.")
+            elif not is_strong_password(pwd):
+                st.error("Password must be strong (A-Z, a-z, 0-9, symbol, min 8 chars).")
+            elif password_too_long(pwd):
+                st.error(f"Password must be at most {MAX_PASSWORD_BYTES} bytes long.")
+            elif not is_valid_marks(marks_10th) or not is_valid_marks(marks_12th):
+                st.error("Marks must be numeric (decimals allowed), e.g. 85 or 85.50")
+            else:
+                photo_path = save_file(photo, f"{uname}_photo.jpg")
+                sign_path = save_file(sign, f"{uname}_sign.jpg")
+                try:
                     values = [
-                        uname, pwd, name, father, mother, gender,
+                        uname, hash_password(pwd), name, father, mother, gender,
                         address, city, state, phone, rrn, enroll,
                         degree, branch, sem, scheme, marks_10th, marks_12th,
                         photo_path, sign_path
                     ]
-                    try:
-                        c.execute(insert_sql, tuple(values))
-                        conn.commit()
-                        st.success("✅ Registered successfully. Please log in.")
-                    except sqlite3.IntegrityError:
-                        st.error("Username already exists. Choose a different username.")
-                    except Exception as e:
-                        st.error(f"Error saving data: {e}")
+                    c.execute(INSERT_SQL, tuple(values))
+                    conn.commit()
+                    st.success("✅ Registered successfully. Please log in.")
+                except sqlite3.IntegrityError:
+                    st.error("Username already exists. Choose a different username.")
+                except Exception as e:
+                    st.error(f"Error saving data: {e}")
+
+
+@st.fragment
+def _render_login():
+    st.subheader("🔐 Login")
+    with st.form("login_form"):
+        uname = st.text_input("Username", key="login_uname")
+        pwd = st.text_input("Password", type="password", key="login_pwd")
+
+        # --- ALWAYS SHOW CAPTCHA ---
+        a, b, ans = st.session_state.captcha
+        user_ans = st.text_input(f"Captcha: What is {a} + {b}?", key="captcha_input")
+
+        submit_login = st.form_submit_button("Login")
+
+        if submit_login:
+            # Validate captcha first
+            try:
+                captcha_ok = int(user_ans) == ans
+            except Exception:
+                captcha_ok = False
+
+            if not captcha_ok:
+                st.session_state.login_failed_count += 1
+                st.error("Captcha incorrect. Please try again.")
+                # regenerate captcha for next attempt
+                st.session_state.captcha = _new_captcha()
+            else:
+                # captcha passed, now check credentials
+                # fetch only what login needs; older databases may hold several rows per username
+                c.execute("SELECT rowid, uname, pwd, name FROM students WHERE uname=?", (uname,))
+                user = next((r for r in c.fetchall() if verify_password(pwd, r["pwd"])), None)
+                if user:
+                    if not is_password_hash(user["pwd"]) and not password_too_long(pwd):
+                        # upgrade legacy plaintext password on first successful login
+                        c.execute("UPDATE students SET pwd=? WHERE rowid=?", (hash_password(pwd), user["rowid"]))
+                    st.session_state.logged_in = True
+                    st.session_state.user_data = {"rowid": user["rowid"], "uname": user["uname"], "name": user["name"]}
+                    st.session_state.login_failed_count = 0
+                    st.success(f"✅ Welcome {user['name']}!")
+                    # regenerate captcha for next time
+                    st.session_state.captcha = _new_captcha()
+                    st.rerun()
+                else:
+                    st.session_state.login_failed_count += 1
+                    st.error("❌ Invalid credentials.")
+                    # regenerate captcha for next attempt
+                    st.session_state.captcha = _new_captcha()
+
+
+def login_register():
+    show_header()
+    tab = st.radio("Select Option", ["Login", "Register"])
 
+    # each tab is a fragment, so its widgets rerun on their own without rebuilding the rest of the page
+    if tab == "Register":
+        _render_register()
     elif tab == "Login":
-        st.subheader("🔐 Login")
-        with st.form("login_form"):
-            uname = st.text_input("Username", key="login_uname")
-            pwd = st.text_input("Password", type="password", key="login_pwd")
+        _render_login()
 
-            # --- ALWAYS SHOW CAPTCHA ---
-            a, b, ans = st.session_state.captcha
-            user_ans = st.text_input(f"Captcha: What is {a} + {b}?", key="captcha_input")
 
-            submit_login = st.form_submit_button("Login")
+# --- PDF ---
 
-            if submit_login:
-                # Validate captcha first
-                try:
-                    captcha_ok = int(user_ans) == ans
-                except Exception:
-                    captcha_ok = False
+@st.cache_data(show_spinner=False, max_entries=256)
+def build_pdf(uname, photo_mtime, sign_mtime, user_items):
+    """Render the student detail PDF. Cached on the record and image mtimes so repeat downloads are instant."""
+    user_dict = dict(user_items)
+    pdf_buffer = BytesIO()
+    c_pdf = canvas.Canvas(pdf_buffer, pagesize=letter)
 
-                if not captcha_ok:
-                    st.session_state.login_failed_count += 1
-                    st.error("Captcha incorrect. Please try again.")
-                    # regenerate captcha for next attempt
-                    import random
-                    a = random.randint(2, 12)
-                    b = random.randint(2, 12)
-                    st.session_state.captcha = (a, b, a + b)
-                else:
-                    # captcha passed, now check credentials
-                    c.execute("SELECT * FROM students WHERE uname=? AND pwd=?", (uname, pwd))
-                    user = c.fetchone()
-                    if user:
-                        st.session_state.logged_in = True
-                        st.session_state.user_data = user
-                        st.session_state.login_failed_count = 0
-                        st.success(f"✅ Welcome {user[2]}!")
-                        # regenerate captcha for next time
-                        import random
-                        a = random.randint(2, 12)
-                        b = random.randint(2, 12)
-                        st.session_state.captcha = (a, b, a + b)
-                        st.rerun()
-                    else:
-                        st.session_state.login_failed_count += 1
-                        st.error("❌ Invalid credentials.")
-                        # regenerate captcha for next attempt
-                        import random
-                        a = random.randint(2, 12)
-                        b = random.randint(2, 12)
-                        st.session_state.captcha = (a, b, a + b)
+    # --- Logo ---
+    if LOGO_EXISTS:
+        try:
+            c_pdf.drawImage(ImageReader(LOGO_PATH), 40, 720, width=60, height=60, preserveAspectRatio=True)
+        except Exception:
+            pass
+
+    c_pdf.setFont("Helvetica-Bold", 16)
+    c_pdf.drawCentredString(300, 750, "Joshi's and Kumawat University")
+
+    # --- Photo & Signature row (separate row/column) ---
+    # Coordinates and sizes
+    top_y = 700  # start y (below title)
+    box_height = 140
+    box_width = 220
+    gap = 20
+    left_x = 40
+    right_x = left_x + box_width + gap
+
+    # Draw boxes (borders)
+    c_pdf.rect(left_x, top_y - box_height, box_width, box_height)   # Photo box
+    c_pdf.rect(right_x, top_y - box_height, box_width, box_height)  # Signature box
+
+    # Add labels under each box
+    c_pdf.setFont("Helvetica-Bold", 10)
+    c_pdf.drawString(left_x, top_y - box_height - 12, "Photo")
+    c_pdf.drawString(right_x, top_y - box_height - 12, "Signature")
+
+    # Try to draw photo and signature images (scale to fit keeping aspect ratio)
+    photo_path = user_dict.get("photo_path")
+    sign_path = user_dict.get("sign_path")
+
+    def draw_image_in_box(img_path, box_x, box_y_top, box_w, box_h, alt_text="Image not found"):
+        if img_path and _exists(img_path):
+            try:
+                # ImageReader reads the size from the file header; the pixels are decoded once by drawImage
+                reader = ImageReader(img_path)
+                # maintain aspect ratio and fit inside box with some padding
+                max_w = box_w - 8
+                max_h = box_h - 8
+                im_w, im_h = reader.getSize()
+                ratio = min(max_w / im_w, max_h / im_h, 1.0)
+                disp_w = im_w * ratio
+                disp_h = im_h * ratio
+                # center image inside box
+                x_pos = box_x + (box_w - disp_w) / 2
+                y_pos = box_y_top - box_h + (box_h - disp_h) / 2
+                c_pdf.drawImage(reader, x_pos, y_pos, width=disp_w, height=disp_h)
+                return
+            except Exception:
+                pass
+        # if we reach here, image missing or failed -> put alt text centered
+        c_pdf.setFont("Helvetica", 9)
+        text_x = box_x + 6
+        text_y = box_y_top - box_h / 2
+        c_pdf.drawString(text_x, text_y, alt_text)
+
+    # draw the photo and signature inside their boxes
+    draw_image_in_box(photo_path, left_x, top_y, box_width, box_height, alt_text="Photo not found")
+    draw_image_in_box(sign_path, right_x, top_y, box_width, box_height, alt_text="Signature not found")
+
+    # --- Table of fields below the image row ---
+    fields = [
+        "Name", "Father", "Mother", "Gender", "Address", "City", "State",
+        "Phone", "Alternative number", "Enroll",
+        "Degree", "Branch", "Sem", "Year", "10th Marks", "12th Marks"
+    ]
+
+    # mapping: human label -> actual stored value from user_dict (use actual column names)
+    mapping = {
+        "Name": user_dict.get("name", ""),
+        "Father": user_dict.get("father", ""),
+        "Mother": user_dict.get("mother", ""),
+        "Gender": user_dict.get("gender", ""),
+        "Address": user_dict.get("address", ""),
+        "City": user_dict.get("city", ""),
+        "State": user_dict.get("state", ""),
+        "Phone": user_dict.get("phone", ""),
+        "Alternative number": user_dict.get("rrn", ""),
+        "Enroll": user_dict.get("enroll", ""),
+        "Degree": user_dict.get("degree", ""),
+        "Branch": user_dict.get("branch", ""),
+        "Sem": user_dict.get("sem", ""),
+        "Year": user_dict.get("scheme", ""),
+        "10th Marks": user_dict.get("marks_10th", ""),
+        "12th Marks": user_dict.get("marks_12th", "")
+    }
+
+    table_x = 40
+    table_y_start = top_y - box_height - 40  # start the table below the image row
+    row_height = 26
+    col_widths = [140, 360]
+    num_rows = len(fields)
+    table_width = col_widths[0] + col_widths[1]
+
+    # Draw horizontal lines
+    for i in range(num_rows + 1):
+        y = table_y_start - i * row_height
+        c_pdf.line(table_x, y, table_x + table_width, y)
+
+    # Draw vertical lines (left border, middle, right border)
+    c_pdf.line(table_x, table_y_start, table_x, table_y_start - num_rows * row_height)
+    c_pdf.line(table_x + col_widths[0], table_y_start, table_x + col_widths[0], table_y_start - num_rows * row_height)
+    c_pdf.line(table_x + table_width, table_y_start, table_x + table_width, table_y_start - num_rows * row_height)
+
+    c_pdf.setFont("Helvetica-Bold", 11)
+    text_padding_x = 6
+    text_padding_y = 7
+    value_width = col_widths[1] - 2 * text_padding_x
+    for idx, label in enumerate(fields):
+        y_top = table_y_start - idx * row_height
+        y_text = y_top - row_height + text_padding_y
+        c_pdf.setFont("Helvetica-Bold", 10)
+        c_pdf.drawString(table_x + text_padding_x, y_text + 4, f"{label}:")
+        value = str(mapping.get(label, ""))
+        c_pdf.setFont("Helvetica", 10)
+        # wrap by rendered width rather than character count
+        lines = simpleSplit(value, "Helvetica", 10, value_width) or [""]
+
+        for li, vline in enumerate(lines):
+            line_y = y_top - (li + 1) * 12
+            bottom_limit = table_y_start - num_rows * row_height
+            if line_y < bottom_limit + 6:
+                vline = vline[:40] + "..."
+            c_pdf.drawString(table_x + col_widths[0] + text_padding_x, line_y + 4, vline)
+
+    c_pdf.save()
+    return pdf_buffer.getvalue()
+
+
+def _mtime(path):
+    try:
+        return os.path.getmtime(path) if path else 0
+    except OSError:
+        return 0
 
 
 # --- Dashboard ---
 
+def load_user_details(rowid, uname):
+    """Fetch the full record of the logged-in student as a sqlite3.Row, or None if it no longer exists."""
+    # SQLite can reuse the rowid of a deleted row, so also match the username
+    c.execute(f"SELECT {COLS_SQL} FROM students WHERE rowid=? AND uname=?", (rowid, uname))
+    return c.fetchone()
+
+
 def dashboard(user):
     show_header()
     st.sidebar.title("📁 Tabs")
 
     # admin sees extra options
-    is_admin_user = (user[0] == 'admin')
+    is_admin_user = (user["uname"] == 'admin')
     base_options = ["Home", "About Me", "College Detail", "Photo & Signature", "Download PDF"]
     admin_options = ["Admin Dashboard"] if is_admin_user else []
     option = st.sidebar.radio("Go to", base_options + admin_options + ["Logout"])
@@ -317,220 +644,87 @@ def dashboard(user):
         st.success("You are logged out.")
         st.rerun()
 
-    c.execute("PRAGMA table_info(students)")
-    col_info = c.fetchall()
-    col_names = [row[1] for row in col_info]
-    user_dict = dict(zip(col_names, user))
+    # the student tabs need the full record; the admin dashboard does not
+    record = load_user_details(user["rowid"], user["uname"]) if option in base_options else None
+    if option in base_options and record is None:
+        st.session_state.logged_in = False
+        st.session_state.user_data = None
+        st.error("Your record was not found. Please log in again.")
+        return
 
     if option == "Home":
         st.title("🎓 Student Dashboard")
         col1, col2 = st.columns([1, 2])
         with col1:
-            photo = user_dict.get("photo_path")
-            sign = user_dict.get("sign_path")
-            if photo and os.path.exists(photo):
-                st.image(photo, width=150, caption=f"Photo - {user_dict.get('name')}")
+            photo = record["photo_path"]
+            sign = record["sign_path"]
+            if photo and _exists(photo):
+                st.image(photo, width=150, caption=f"Photo - {record['name']}")
             else:
                 st.info("Photo not found")
-            if sign and os.path.exists(sign):
-                st.image(sign, width=150, caption=f"Signature - {user_dict.get('name')}")
+            if sign and _exists(sign):
+                st.image(sign, width=150, caption=f"Signature - {record['name']}")
             else:
                 st.info("Signature not found")
         with col2:
             st.markdown(f"""
-                **Name:** {user_dict.get('name', '')}  
-                **RRN:** {user_dict.get('rrn', '')}  
-                **Enrollment No.:** {user_dict.get('enroll', '')}  
-                **Branch:** {user_dict.get('branch', '')}  
-                **Semester:** {user_dict.get('sem', '')}  
-                **10th Marks:** {user_dict.get('marks_10th', '')}  
-                **12th Marks:** {user_dict.get('marks_12th', '')}  
+                **Name:** {record['name']}  
+                **RRN:** {record['rrn']}  
+                **Enrollment No.:** {record['enroll']}  
+                **Branch:** {record['branch']}  
+                **Semester:** {record['sem']}  
+                **10th Marks:** {record['marks_10th']}  
+                **12th Marks:** {record['marks_12th']}  
             """)
 
     elif option == "About Me":
         st.header("👤 About Me")
         st.markdown(f"""
-            **Name:** {user_dict.get('name', '')}  
-            **Father's Name:** {user_dict.get('father', '')}  
-            **Mother's Name:** {user_dict.get('mother', '')}  
-            **Gender:** {user_dict.get('gender', '')}  
-            **Phone:** {user_dict.get('phone', '')}  
-            **Address:** {user_dict.get('address', '')}, {user_dict.get('city', '')}, {user_dict.get('state', '')}  
+            **Name:** {record['name']}  
+            **Father's Name:** {record['father']}  
+            **Mother's Name:** {record['mother']}  
+            **Gender:** {record['gender']}  
+            **Phone:** {record['phone']}  
+            **Address:** {record['address']}, {record['city']}, {record['state']}  
         """)
 
     elif option == "College Detail":
         st.header("🏫 College Details")
         st.markdown(f"""
-            **Alternative number:** {user_dict.get('rrn', '')}  
-            **Enrollment No.:** {user_dict.get('enroll', '')}  
-            **Degree:** {user_dict.get('degree', '')}  
-            **Branch:** {user_dict.get('branch', '')}  
-            **Semester:** {user_dict.get('sem', '')}  
-            **Year:** {user_dict.get('scheme', '')}  
-            **10th Marks:** {user_dict.get('marks_10th', '')}  
-            **12th Marks:** {user_dict.get('marks_12th', '')}  
+            **Alternative number:** {record['rrn']}  
+            **Enrollment No.:** {record['enroll']}  
+            **Degree:** {record['degree']}  
+            **Branch:** {record['branch']}  
+            **Semester:** {record['sem']}  
+            **Year:** {record['scheme']}  
+            **10th Marks:** {record['marks_10th']}  
+            **12th Marks:** {record['marks_12th']}  
         """)
 
     elif option == "Photo & Signature":
         st.header("📷 Photo and Signature")
-        photo = user_dict.get("photo_path")
-        sign = user_dict.get("sign_path")
-        if photo and os.path.exists(photo):
-            st.image(photo, width=200, caption=f"Student Photo - {user_dict.get('name')}")
+        photo = record["photo_path"]
+        sign = record["sign_path"]
+        if photo and _exists(photo):
+            st.image(photo, width=200, caption=f"Student Photo - {record['name']}")
         else:
             st.info("Photo not found")
-        if sign and os.path.exists(sign):
-            st.image(sign, width=200, caption=f"Student Signature - {user_dict.get('name')}")
+        if sign and _exists(sign):
+            st.image(sign, width=200, caption=f"Student Signature - {record['name']}")
         else:
             st.info("Signature not found")
 
     elif option == "Download PDF":
         st.header("📄 Download Details as PDF")
         if st.button("Generate PDF"):
-            pdf_buffer = BytesIO()
-            c_pdf = canvas.Canvas(pdf_buffer, pagesize=letter)
-
-            # --- Logo ---
-            logo_path = r"C:\Users\kumaw\PycharmProjects\PythonProject\logo1.png"
-            if os.path.exists(logo_path):
-                try:
-                    c_pdf.drawImage(ImageReader(logo_path), 40, 720, width=60, height=60, preserveAspectRatio=True)
-                except Exception:
-                    pass
-
-            c_pdf.setFont("Helvetica-Bold", 16)
-            c_pdf.drawCentredString(300, 750, "Joshi's and Kumawat University")
-
-            # --- Photo & Signature row (separate row/column) ---
-            # Coordinates and sizes
-            top_y = 700  # start y (below title)
-            box_height = 140
-            box_width = 220
-            gap = 20
-            left_x = 40
-            right_x = left_x + box_width + gap
-
-            # Draw boxes (borders)
-            c_pdf.rect(left_x, top_y - box_height, box_width, box_height)   # Photo box
-            c_pdf.rect(right_x, top_y - box_height, box_width, box_height)  # Signature box
-
-            # Add labels under each box
-            c_pdf.setFont("Helvetica-Bold", 10)
-            c_pdf.drawString(left_x, top_y - box_height - 12, "Photo")
-            c_pdf.drawString(right_x, top_y - box_height - 12, "Signature")
-
-            # Try to draw photo and signature images (scale to fit keeping aspect ratio)
-            photo_path = user_dict.get("photo_path")
-            sign_path = user_dict.get("sign_path")
-
-            def draw_image_in_box(img_path, box_x, box_y_top, box_w, box_h, alt_text="Image not found"):
-                if img_path and os.path.exists(img_path):
-                    try:
-                        with Image.open(img_path) as im:
-                            # maintain aspect ratio and fit inside box with some padding
-                            max_w = box_w - 8
-                            max_h = box_h - 8
-                            im_w, im_h = im.size
-                            ratio = min(max_w / im_w, max_h / im_h, 1.0)
-                            disp_w = im_w * ratio
-                            disp_h = im_h * ratio
-                            # center image inside box
-                            x_pos = box_x + (box_w - disp_w) / 2
-                            y_pos = box_y_top - box_h + (box_h - disp_h) / 2
-                            c_pdf.drawImage(ImageReader(im), x_pos, y_pos, width=disp_w, height=disp_h, preserveAspectRatio=True)
-                            return
-                    except Exception:
-                        pass
-                # if we reach here, image missing or failed -> put alt text centered
-                c_pdf.setFont("Helvetica", 9)
-                text_x = box_x + 6
-                text_y = box_y_top - box_h / 2
-                c_pdf.drawString(text_x, text_y, alt_text)
-
-            # draw the photo and signature inside their boxes
-            draw_image_in_box(photo_path, left_x, top_y, box_width, box_height, alt_text="Photo not found")
-            draw_image_in_box(sign_path, right_x, top_y, box_width, box_height, alt_text="Signature not found")
-
-            # --- Table of fields below the image row ---
-            fields = [
-                "Name", "Father", "Mother", "Gender", "Address", "City", "State",
-                "Phone", "Alternative number", "Enroll",
-                "Degree", "Branch", "Sem", "Year", "10th Marks", "12th Marks"
-            ]
-
-            # mapping: human label -> actual stored value from user_dict (use actual column names)
-            mapping = {
-                "Name": user_dict.get("name", ""),
-                "Father": user_dict.get("father", ""),
-                "Mother": user_dict.get("mother", ""),
-                "Gender": user_dict.get("gender", ""),
-                "Address": user_dict.get("address", ""),
-                "City": user_dict.get("city", ""),
-                "State": user_dict.get("state", ""),
-                "Phone": user_dict.get("phone", ""),
-                "Alternative number": user_dict.get("rrn", ""),
-                "Enroll": user_dict.get("enroll", ""),
-                "Degree": user_dict.get("degree", ""),
-                "Branch": user_dict.get("branch", ""),
-                "Sem": user_dict.get("sem", ""),
-                "Year": user_dict.get("scheme", ""),
-                "10th Marks": user_dict.get("marks_10th", ""),
-                "12th Marks": user_dict.get("marks_12th", "")
-            }
-
-            table_x = 40
-            table_y_start = top_y - box_height - 40  # start the table below the image row
-            row_height = 26
-            col_widths = [140, 360]
-            num_rows = len(fields)
-            table_width = col_widths[0] + col_widths[1]
-
-            # Draw horizontal lines
-            for i in range(num_rows + 1):
-                y = table_y_start - i * row_height
-                c_pdf.line(table_x, y, table_x + table_width, y)
-
-            # Draw vertical lines (left border, middle, right border)
-            c_pdf.line(table_x, table_y_start, table_x, table_y_start - num_rows * row_height)
-            c_pdf.line(table_x + col_widths[0], table_y_start, table_x + col_widths[0], table_y_start - num_rows * row_height)
-            c_pdf.line(table_x + table_width, table_y_start, table_x + table_width, table_y_start - num_rows * row_height)
-
-            c_pdf.setFont("Helvetica-Bold", 11)
-            text_padding_x = 6
-            text_padding_y = 7
-            for idx, label in enumerate(fields):
-                y_top = table_y_start - idx * row_height
-                y_text = y_top - row_height + text_padding_y
-                c_pdf.setFont("Helvetica-Bold", 10)
-                c_pdf.drawString(table_x + text_padding_x, y_text + 4, f"{label}:")
-                value = str(mapping.get(label, ""))
-                c_pdf.setFont("Helvetica", 10)
-                max_chars_per_line = 55
-                lines = []
-                if value:
-                    words = value.split()
-                    current_line = ""
-                    for w in words:
-                        if len(current_line) + len(w) + 1 <= max_chars_per_line:
-                            current_line = (current_line + " " + w).strip()
-                        else:
-                            lines.append(current_line)
-                            current_line = w
-                    if current_line:
-                        lines.append(current_line)
-                else:
-                    lines = [""]
-
-                for li, vline in enumerate(lines):
-                    line_y = y_top - (li + 1) * 12
-                    bottom_limit = table_y_start - num_rows * row_height
-                    if line_y < bottom_limit + 6:
-                        vline = vline[:40] + "..."
-                    c_pdf.drawString(table_x + col_widths[0] + text_padding_x, line_y + 4, vline)
-
-            c_pdf.save()
-            pdf_buffer.seek(0)
-            st.download_button("📥 Download PDF", data=pdf_buffer.getvalue(), file_name="student_detail.pdf", mime="application/pdf")
+            pdf_bytes = build_pdf(
+                record["uname"],
+                _mtime(record["photo_path"]),
+                _mtime(record["sign_path"]),
+                # the password hash is not printed, so keep it out of the cache key
+                tuple((k, v) for k, v in zip(record.keys(), record) if k != "pwd"),
+            )
+            st.download_button("📥 Download PDF", data=pdf_bytes, file_name="student_detail.pdf", mime="application/pdf")
 
     elif option == "Admin Dashboard":
         st.header("🛠️ Admin Dashboard")
@@ -541,15 +735,13 @@ def dashboard(user):
         # --- User List ---
         with tab_admin[0]:
             st.subheader("All Registered Users")
-            c.execute("SELECT * FROM students")
+            # password hashes are left out of the listing
+            list_cols = [col for col in COL_NAMES if col != "pwd"]
+            c.execute(f"SELECT {', '.join(list_cols)} FROM students")
             rows = c.fetchall()
-            c.execute("PRAGMA table_info(students)")
-            cols = [r[1] for r in c.fetchall()]
-            # simple table
             if rows:
-                st.write(cols)
-                for r in rows:
-                    st.write(dict(zip(cols, r)))
+                df = pd.DataFrame([tuple(r) for r in rows], columns=list_cols)
+                st.dataframe(df, use_container_width=True, hide_index=True)
             else:
                 st.info("No users found.")
 
@@ -557,6 +749,7 @@ def dashboard(user):
         with tab_admin[1]:
             st.subheader("Bulk Import from CSV")
             st.markdown("CSV must contain headers exactly matching database columns. Example template available in Export All tab.")
+            st.caption("Plaintext passwords are hashed during import, which takes roughly a quarter of a second per row.")
             uploaded_csv = st.file_uploader("Upload CSV file (UTF-8)", type=["csv"])
             if uploaded_csv is not None:
                 imported, errors = import_users_from_csv(uploaded_csv)
@@ -599,8 +792,10 @@ def dashboard(user):
                 if rst_user and new_pwd:
                     if rst_user == 'admin':
                         st.error("Reset admin password directly in DB or change after login.")
+                    elif password_too_long(new_pwd):
+                        st.error(f"Password must be at most {MAX_PASSWORD_BYTES} bytes long.")
                     else:
-                        c.execute("UPDATE students SET pwd=? WHERE uname=?", (new_pwd, rst_user))
+                        c.execute("UPDATE students SET pwd=? WHERE uname=?", (hash_password(new_pwd), rst_user))
                         conn.commit()
                         st.success(f"Password reset for {rst_user}")
                 else: